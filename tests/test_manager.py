@@ -0,0 +1,87 @@
+import unittest
+import uuid
+import warnings
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+from weaviate_rag_lifecycle import WeaviateRAGLifecycleManager
+from weaviate_rag_lifecycle.lifecycle import manager as manager_module
+
+
+def _manager(legacy):
+    client = mock.Mock()
+    collections = {}
+    client.collections.get.side_effect = lambda name: collections.setdefault(name, mock.Mock(name=name))
+    manager = WeaviateRAGLifecycleManager(client)
+    with mock.patch.object(manager_module, "init_schemas", return_value=["RAGDataset"] if legacy else []):
+        manager.initialize()
+    for collection in collections.values():
+        collection.query.fetch_object_by_id.return_value = None
+        collection.query.fetch_objects.return_value = SimpleNamespace(objects=[])
+    return manager
+
+
+class ClientLifetimeTest(unittest.TestCase):
+    def test_with_block_closes_sync_client(self):
+        client = mock.Mock()
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            with WeaviateRAGLifecycleManager(client):
+                pass
+        client.close.assert_called_once()
+
+    def test_with_block_warns_about_connected_async_client(self):
+        client, async_client = mock.Mock(), mock.Mock()
+        async_client.is_connected.return_value = True
+
+        with self.assertWarns(UserWarning):
+            with WeaviateRAGLifecycleManager(client, async_client=async_client):
+                pass
+        client.close.assert_called_once()
+        async_client.close.assert_not_called()
+
+
+class LegacyLookupTest(unittest.TestCase):
+    def test_migrated_miss_costs_one_request(self):
+        manager = _manager(legacy=False)
+
+        self.assertIsNone(manager.get_index_generation(str(uuid.uuid4())))
+        manager._gen_coll.query.fetch_object_by_id.assert_called_once()
+        manager._gen_coll.query.fetch_objects.assert_not_called()
+
+    def test_legacy_miss_falls_back_to_id_property(self):
+        manager = _manager(legacy=True)
+        gen_id = str(uuid.uuid4())
+        legacy_uuid = uuid.uuid4()
+        now = datetime.now(timezone.utc)
+        manager._gen_coll.query.fetch_objects.return_value = SimpleNamespace(objects=[SimpleNamespace(
+            uuid=legacy_uuid,
+            properties={
+                "generation_id": gen_id, "dataset_id": "ds", "config_id": "cfg", "status": "staging",
+                "weaviate_collection_name": "Index_x", "created_at": now, "updated_at": now,
+            },
+        )])
+
+        self.assertEqual(manager._fetch_generation(gen_id)[0], str(legacy_uuid))
+
+    def test_non_uuid_id_is_not_looked_up(self):
+        manager = _manager(legacy=True)
+
+        self.assertIsNone(manager.get_index_generation("not-a-uuid"))
+        manager._gen_coll.query.fetch_object_by_id.assert_not_called()
+        manager._gen_coll.query.fetch_objects.assert_not_called()
+
+    def test_missing_production_index_skips_legacy_query_once_migrated(self):
+        manager = _manager(legacy=False)
+
+        self.assertIsNone(manager.get_production_index("docs"))
+        self.assertIsNone(manager.get_production_index("docs"))
+        manager._ds_coll.query.fetch_objects.assert_not_called()
+        # Pointer GET and join once; the second call is a cached miss
+        manager._pointer_coll.query.fetch_object_by_id.assert_called_once()
+        manager._gen_coll.query.fetch_objects.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
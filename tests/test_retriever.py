@@ -0,0 +1,80 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from weaviate_rag_lifecycle import LifecycleAwareRetriever, LifecycleState, WeaviateRAGLifecycleManager
+from weaviate_rag_lifecycle.lifecycle.models import IndexGeneration
+
+
+def _generation():
+    return IndexGeneration(
+        id="gen-1", dataset_id="ds-1", config_id="cfg-1",
+        status=LifecycleState.PRODUCTION, weaviate_collection_name="Index_gen1",
+    )
+
+
+def _retriever(objects):
+    manager = mock.Mock()
+    manager.get_production_index.return_value = _generation()
+    query = manager.client.collections.get.return_value.query
+    query.near_text.return_value = SimpleNamespace(objects=objects)
+    return LifecycleAwareRetriever(lifecycle_manager=manager, dataset_name="docs"), query
+
+
+class QueryCacheTest(unittest.TestCase):
+    def test_repeated_query_is_served_from_cache(self):
+        retriever, query = _retriever([SimpleNamespace(properties={"text": "a", "tags": ["x"]})])
+
+        first = retriever.invoke("q")
+        second = retriever.invoke("q")
+
+        self.assertEqual(query.near_text.call_count, 1)
+        self.assertEqual(first, second)
+
+    def test_mutations_do_not_leak_into_cache(self):
+        retriever, _ = _retriever([SimpleNamespace(properties={"text": "a", "tags": ["x"]})])
+
+        first = retriever.invoke("q")
+        first[0].metadata["score"] = 1.0
+        first[0].metadata["tags"].append("y")
+        second = retriever.invoke("q")
+        second[0].page_content = "changed"
+
+        third = retriever.invoke("q")
+        self.assertEqual(third[0].page_content, "a")
+        self.assertEqual(third[0].metadata, {"text": "a", "tags": ["x"]})
+
+
+class AsyncRetrievalTest(unittest.IsolatedAsyncioTestCase):
+    async def test_reuses_async_collection_handle(self):
+        manager = mock.Mock()
+        manager.aget_production_index = mock.AsyncMock(return_value=_generation())
+        async_client = mock.Mock()
+        manager.get_async_client = mock.AsyncMock(return_value=async_client)
+        collection = async_client.collections.get.return_value
+        collection.query.near_text = mock.AsyncMock(
+            return_value=SimpleNamespace(objects=[SimpleNamespace(properties={"text": "a"})])
+        )
+        retriever = LifecycleAwareRetriever(lifecycle_manager=manager, dataset_name="docs")
+
+        await retriever.ainvoke("q1")
+        docs = await retriever.ainvoke("q2")
+
+        self.assertEqual(docs[0].page_content, "a")
+        self.assertEqual(collection.query.near_text.await_count, 2)
+        async_client.collections.get.assert_called_once_with("Index_gen1")
+
+    async def test_cached_production_index_stays_on_the_loop(self):
+        manager = WeaviateRAGLifecycleManager(mock.Mock())
+        with mock.patch.object(manager, "_query_production_index", return_value=_generation()) as query:
+            self.assertEqual(manager.get_production_index("docs").id, "gen-1")
+            with mock.patch("asyncio.BaseEventLoop.run_in_executor") as run_in_executor:
+                gen = await manager.aget_production_index("docs")
+
+        self.assertEqual(gen.id, "gen-1")
+        run_in_executor.assert_not_called()
+        query.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,239 @@
+"""
+Tests for `migrate_schemas`, run against an in-memory stand-in for the parts of
+the Weaviate client it uses. Interruptions are simulated by failing a chosen
+create/delete/insert call and re-running the migration.
+"""
+import unittest
+import uuid
+from types import SimpleNamespace
+
+import weaviate.classes.config as wvc
+
+from weaviate_rag_lifecycle.lifecycle.schema import (
+    init_schemas, migrate_schemas, _SCHEMAS,
+    DATASET_CLASS, CONFIG_CLASS, GENERATION_CLASS, PRODUCTION_POINTER_CLASS,
+)
+
+
+class Interrupted(Exception):
+    pass
+
+
+class FakeCollection:
+    def __init__(self, client, name):
+        self._client = client
+        self._name = name
+        self.data = SimpleNamespace(insert_many=self._insert_many)
+        self.aggregate = SimpleNamespace(over_all=self._over_all)
+
+    def iterator(self):
+        return [
+            SimpleNamespace(uuid=uuid.UUID(obj_uuid), properties=dict(obj["properties"]))
+            for obj_uuid, obj in self._client.objects[self._name].items()
+        ]
+
+    def _insert_many(self, objects):
+        self._client.step("insert_many", self._name)
+        for obj in objects:
+            self._client.objects[self._name][str(obj.uuid)] = {
+                "properties": dict(obj.properties),
+                "references": obj.references,
+            }
+        return SimpleNamespace(has_errors=False, errors={})
+
+    def _over_all(self, total_count):
+        return SimpleNamespace(total_count=len(self._client.objects[self._name]))
+
+
+class FakeCollections:
+    def __init__(self, client):
+        self._client = client
+
+    def list_all(self):
+        return {name: SimpleNamespace(properties=props) for name, props in self._client.configs.items()}
+
+    def create(self, name, properties, references=None):
+        self._client.step("create", name)
+        # Mirror the server defaults for settings left unset
+        self._client.configs[name] = [
+            SimpleNamespace(
+                name=prop.name,
+                index_filterable=True if prop.indexFilterable is None else prop.indexFilterable,
+                index_range_filters=bool(prop.indexRangeFilters),
+                tokenization=prop.tokenization or (
+                    wvc.Tokenization.WORD if prop.dataType == wvc.DataType.TEXT else None
+                ),
+            )
+            for prop in properties
+        ]
+        self._client.objects[name] = {}
+
+    def delete(self, name):
+        self._client.step("delete", name)
+        self._client.configs.pop(name, None)
+        self._client.objects.pop(name, None)
+
+    def exists(self, name):
+        return name in self._client.configs
+
+    def get(self, name):
+        return FakeCollection(self._client, name)
+
+
+class FakeClient:
+    def __init__(self):
+        self.configs = {}
+        self.objects = {}
+        self.collections = FakeCollections(self)
+        self.fail_at = None
+
+    def step(self, op, name):
+        if self.fail_at == (op, name):
+            self.fail_at = None
+            raise Interrupted(f"{op} {name}")
+
+
+def _text(name):
+    return wvc.Property(name=name, data_type=wvc.DataType.TEXT)
+
+def _date(name):
+    return wvc.Property(name=name, data_type=wvc.DataType.DATE)
+
+
+class MigrateSchemasTest(unittest.TestCase):
+    def setUp(self):
+        # Collections and objects as written by the original release: default
+        # index settings and random object UUIDs.
+        self.client = FakeClient()
+        collections = self.client.collections
+        collections.create(DATASET_CLASS, [_text("dataset_id"), _text("name"), _text("version"), _date("created_at")])
+        collections.create(CONFIG_CLASS, [
+            _text("config_id"), _text("model_name"),
+            wvc.Property(name="chunk_size", data_type=wvc.DataType.INT),
+            wvc.Property(name="chunk_overlap", data_type=wvc.DataType.INT),
+            _date("created_at"),
+        ])
+        collections.create(GENERATION_CLASS, [
+            _text("generation_id"), _text("dataset_id"), _text("config_id"), _text("status"),
+            _text("weaviate_collection_name"), _date("created_at"), _date("updated_at"),
+        ])
+
+        self.dataset_id = str(uuid.uuid4())
+        self.config_id = str(uuid.uuid4())
+        self.generation_ids = [str(uuid.uuid4()) for _ in range(3)]
+        self._put(DATASET_CLASS, {"dataset_id": self.dataset_id, "name": "docs", "version": "v1"})
+        self._put(CONFIG_CLASS, {"config_id": self.config_id, "model_name": "m", "chunk_size": 1, "chunk_overlap": 0})
+        for gen_id in self.generation_ids:
+            self._put(GENERATION_CLASS, {
+                "generation_id": gen_id, "dataset_id": self.dataset_id,
+                "config_id": self.config_id, "status": "staging",
+            })
+
+    def _put(self, name, properties):
+        self.client.objects[name][str(uuid.uuid4())] = {"properties": properties, "references": None}
+
+    def assert_migrated(self, *extra):
+        list_all = self.client.collections.list_all()
+        self.assertEqual(sorted(list_all), sorted([DATASET_CLASS, CONFIG_CLASS, GENERATION_CLASS, *extra]))
+        for name, config in list_all.items():
+            by_name = {prop.name: prop for prop in config.properties}
+            for prop in _SCHEMAS[name]["properties"]:
+                if prop.tokenization is not None:
+                    self.assertEqual(by_name[prop.name].tokenization, prop.tokenization, (name, prop.name))
+                if prop.indexRangeFilters is not None:
+                    self.assertEqual(by_name[prop.name].index_range_filters, prop.indexRangeFilters, (name, prop.name))
+
+        self.assertEqual(list(self.client.objects[DATASET_CLASS]), [self.dataset_id])
+        self.assertEqual(list(self.client.objects[CONFIG_CLASS]), [self.config_id])
+        generations = self.client.objects[GENERATION_CLASS]
+        self.assertEqual(sorted(generations), sorted(self.generation_ids))
+        for obj in generations.values():
+            self.assertEqual(obj["references"], {"hasDataset": self.dataset_id, "hasConfig": self.config_id})
+
+    def test_migrates_legacy_collections(self):
+        migrated = migrate_schemas(self.client)
+
+        self.assertEqual(migrated, [DATASET_CLASS, CONFIG_CLASS, GENERATION_CLASS])
+        self.assert_migrated()
+
+    def test_noop_when_current(self):
+        migrate_schemas(self.client)
+
+        self.assertEqual(migrate_schemas(self.client), [])
+        self.assert_migrated()
+
+    def test_generations_rebuilt_when_only_datasets_are_outdated(self):
+        migrate_schemas(self.client)
+        self.client.collections.delete(DATASET_CLASS)
+        self.client.collections.create(DATASET_CLASS, [_text("dataset_id"), _text("name"), _text("version"), _date("created_at")])
+        self.client.objects[DATASET_CLASS][str(uuid.uuid4())] = {
+            "properties": {"dataset_id": self.dataset_id, "name": "docs", "version": "v1"}, "references": None
+        }
+
+        self.assertEqual(migrate_schemas(self.client), [DATASET_CLASS, GENERATION_CLASS])
+        self.assert_migrated()
+
+    def test_interrupted_while_staging_keeps_originals(self):
+        self.client.fail_at = ("insert_many", GENERATION_CLASS + "_Migration")
+        with self.assertRaises(Interrupted):
+            migrate_schemas(self.client)
+
+        # Nothing was dropped; the originals still hold every object
+        self.assertEqual(len(self.client.objects[GENERATION_CLASS]), 3)
+        self.assertEqual(len(self.client.objects[DATASET_CLASS]), 1)
+
+        migrate_schemas(self.client)
+        self.assert_migrated()
+
+    def test_interrupted_while_dropping_originals(self):
+        self.client.fail_at = ("delete", CONFIG_CLASS)
+        with self.assertRaises(Interrupted):
+            migrate_schemas(self.client)
+        self.assertNotIn(DATASET_CLASS, self.client.configs)
+
+        self.assertEqual(migrate_schemas(self.client), [DATASET_CLASS, CONFIG_CLASS, GENERATION_CLASS])
+        self.assert_migrated()
+
+    def test_interrupted_while_recreating(self):
+        self.client.fail_at = ("insert_many", GENERATION_CLASS)
+        with self.assertRaises(Interrupted):
+            migrate_schemas(self.client)
+        self.assertEqual(self.client.objects[GENERATION_CLASS], {})
+
+        migrate_schemas(self.client)
+        self.assert_migrated()
+
+    def test_interrupted_while_removing_staging(self):
+        self.client.fail_at = ("delete", CONFIG_CLASS + "_Migration")
+        with self.assertRaises(Interrupted):
+            migrate_schemas(self.client)
+
+        migrate_schemas(self.client)
+        self.assert_migrated()
+
+    def test_resume_drops_collections_still_on_old_schema(self):
+        self.client.fail_at = ("create", CONFIG_CLASS)
+        with self.assertRaises(Interrupted):
+            migrate_schemas(self.client)
+        # Simulate a stale original reappearing beside the recreated dataset collection
+        self.client.collections.create(GENERATION_CLASS, [_text("generation_id"), _text("status")])
+
+        migrate_schemas(self.client)
+        self.assert_migrated()
+
+    def test_init_schemas_refuses_pending_migration(self):
+        self.client.fail_at = ("create", DATASET_CLASS)
+        with self.assertRaises(Interrupted):
+            migrate_schemas(self.client)
+
+        with self.assertRaises(RuntimeError):
+            init_schemas(self.client)
+        self.assertNotIn(DATASET_CLASS, self.client.configs)
+
+        migrate_schemas(self.client)
+        self.assertEqual(init_schemas(self.client), [])
+        self.assert_migrated(PRODUCTION_POINTER_CLASS)
+
+
+if __name__ == "__main__":
+    unittest.main()
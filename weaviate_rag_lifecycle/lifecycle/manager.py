@@ -1,20 +1,142 @@
+import asyncio
 import weaviate
-from weaviate.classes.query import Filter
+from weaviate.classes.data import DataObject
+from weaviate.classes.query import Filter, Sort
+import time
 import uuid
-from datetime import datetime
-from typing import Optional, List
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, List, Tuple
 
-from .states import LifecycleState
+from .states import LifecycleState, PROMOTABLE_TO_PROD
 from .models import RAGDataset, EmbeddingConfig, IndexGeneration
-from .schema import init_schemas, DATASET_CLASS, CONFIG_CLASS, GENERATION_CLASS
+from .schema import (
+    init_schemas, migrate_schemas,
+    DATASET_CLASS, CONFIG_CLASS, GENERATION_CLASS, PRODUCTION_POINTER_CLASS
+)
+
+# Concurrency cap for status updates; beyond a handful of in-flight requests
+# the server-side gains flatten out.
+_ARCHIVE_MAX_WORKERS = 8
+
+_UTC = timezone.utc
+_PROD = LifecycleState.PRODUCTION.value
+_DEPRECATED = LifecycleState.DEPRECATED.value
+
+# Filter/sort fragments are immutable (combining them builds new nodes), so the
+# frequently used ones are built once and shared.
+_F_STATUS_PROD = Filter.by_property("status").equal(_PROD)
+_SORT_UPDATED_DESC = Sort.by_property("updated_at", ascending=False)
+
+# The properties mapped into IndexGeneration; queries fetch only these.
+_GENERATION_PROPERTIES = [
+    "generation_id",
+    "dataset_id",
+    "config_id",
+    "status",
+    "weaviate_collection_name",
+    "created_at",
+    "updated_at",
+]
+
+def _to_generation(props: Dict[str, Any]) -> IndexGeneration:
+    return IndexGeneration(
+        id=props["generation_id"],
+        dataset_id=props["dataset_id"],
+        config_id=props["config_id"],
+        status=LifecycleState(props["status"]),
+        weaviate_collection_name=props["weaviate_collection_name"],
+        created_at=props["created_at"],
+        updated_at=props["updated_at"]
+    )
+
+def _is_uuid(value: str) -> bool:
+    # fetch_object_by_id raises on malformed ids instead of returning None
+    try:
+        uuid.UUID(str(value))
+    except ValueError:
+        return False
+    return True
+
+def _pointer_uuid(dataset_name: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_DNS, "prod:" + dataset_name))
 
 class WeaviateRAGLifecycleManager:
-    def __init__(self, client: weaviate.WeaviateClient):
+    def __init__(
+        self,
+        client: weaviate.WeaviateClient,
+        production_cache_ttl: float = 30.0,
+        async_client: Optional[weaviate.WeaviateAsyncClient] = None,
+    ):
+        # One long-lived client of each kind for the manager's lifetime; the
+        # v4 clients pool their HTTP/gRPC connections internally.
         self.client = client
+        # Optional async client, used by LifecycleAwareRetriever's async path.
+        # It is bound to the event loop it is connected on.
+        self.async_client = async_client
+        # Collection handles are cheap to hold and need no schema round-trip, so
+        # resolve them once rather than on every call.
+        self._ds_coll = client.collections.get(DATASET_CLASS)
+        self._cfg_coll = client.collections.get(CONFIG_CLASS)
+        self._gen_coll = client.collections.get(GENERATION_CLASS)
+        self._pointer_coll = client.collections.get(PRODUCTION_POINTER_CLASS)
+        # dataset_name -> (production generation or None, monotonic expiry). Entries
+        # are evicted on promote_index, the TTL only bounds staleness across processes.
+        self._prod_cache: Dict[str, Tuple[Optional[IndexGeneration], float]] = {}
+        self._prod_ttl = production_cache_ttl
+        self._dataset_id_to_name: Dict[str, str] = {}
+        # Whether metadata written by older versions (random UUIDs, no references)
+        # may still exist, enabling the slower legacy lookups. Assumed until
+        # initialize() finds every collection up to date.
+        self._legacy_lookups = True
+
+    def initialize(self, migrate: bool = False):
+        """
+        Initializes the Weaviate schema for lifecycle management.
+        With `migrate=True`, existing metadata collections with outdated index
+        settings are recreated first (see `migrate_schemas`). Legacy lookups for
+        un-migrated metadata stay enabled only while such collections remain.
+        """
+        if migrate and migrate_schemas(self.client):
+            self.invalidate()
+        self._legacy_lookups = bool(init_schemas(self.client))
+
+    async def get_async_client(self) -> Optional[weaviate.WeaviateAsyncClient]:
+        """Returns the async client (connecting it on first use), or None if none was given."""
+        if self.async_client is not None and not self.async_client.is_connected():
+            await self.async_client.connect()
+        return self.async_client
+
+    def close(self):
+        """Closes the sync client. Use `aclose` to close the async client as well."""
+        self.client.close()
 
-    def initialize(self):
-        """Initializes the Weaviate schema for lifecycle management."""
-        init_schemas(self.client)
+    async def aclose(self):
+        """Closes both the async and the sync client."""
+        if self.async_client is not None:
+            await self.async_client.close()
+        self.client.close()
+
+    def __enter__(self) -> "WeaviateRAGLifecycleManager":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Closing the async client needs its event loop, so only `async with` can
+        if self.async_client is not None and self.async_client.is_connected():
+            warnings.warn(
+                "Leaving `with WeaviateRAGLifecycleManager(...)` closes only the sync client; "
+                "the async client is still connected. Use `async with` or `await manager.aclose()`.",
+                stacklevel=2,
+            )
+        self.close()
+
+    async def __aenter__(self) -> "WeaviateRAGLifecycleManager":
+        await self.get_async_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
 
     def create_dataset(self, name: str, version: str) -> RAGDataset:
         """Creates a new RAG Dataset version."""
@@ -24,7 +146,8 @@ class WeaviateRAGLifecycleManager:
             version=version
         )
         
-        self.client.collections.get(DATASET_CLASS).data.insert(
+        self._ds_coll.data.insert(
+            uuid=dataset.id,
             properties={
                 "dataset_id": dataset.id,
                 "name": dataset.name,
@@ -32,6 +155,7 @@ class WeaviateRAGLifecycleManager:
                 "created_at": dataset.created_at
             }
         )
+        self._dataset_id_to_name[dataset.id] = dataset.name
         return dataset
 
     def register_embedding_config(self, model_name: str, chunk_size: int, chunk_overlap: int) -> EmbeddingConfig:
@@ -47,15 +171,11 @@ class WeaviateRAGLifecycleManager:
             chunk_overlap=chunk_overlap
         )
 
-        # Check if exists
-        collection = self.client.collections.get(CONFIG_CLASS)
-        exists = collection.query.fetch_objects(
-            filters=Filter.by_property("config_id").equal(config_id),
-            limit=1
-        )
-        
-        if not exists.objects:
+        # Configs are keyed by their deterministic id, so existence is a cheap id check
+        collection = self._cfg_coll
+        if not collection.data.exists(uuid=config_id):
             collection.data.insert(
+                uuid=config.id,
                 properties={
                     "config_id": config.id,
                     "model_name": config.model_name,
@@ -77,16 +197,20 @@ class WeaviateRAGLifecycleManager:
         # (Weaviate requires class names to be capitalized)
         physical_index_name = f"Index_{gen_id.replace('-', '')}"
 
+        now = datetime.now(_UTC)
         generation = IndexGeneration(
             id=gen_id,
             dataset_id=dataset_id,
             config_id=config_id,
             status=LifecycleState.DRAFT,
-            weaviate_collection_name=physical_index_name
+            weaviate_collection_name=physical_index_name,
+            created_at=now,
+            updated_at=now
         )
 
-        # 1. Record metadata
-        self.client.collections.get(GENERATION_CLASS).data.insert(
+        # 1. Record metadata, keyed by the generation id so updates need no lookup
+        self._gen_coll.data.insert(
+            uuid=generation.id,
             properties={
                 "generation_id": generation.id,
                 "dataset_id": generation.dataset_id,
@@ -95,162 +219,272 @@ class WeaviateRAGLifecycleManager:
                 "weaviate_collection_name": generation.weaviate_collection_name,
                 "created_at": generation.created_at,
                 "updated_at": generation.updated_at
+            },
+            references={
+                "hasDataset": generation.dataset_id,
+                "hasConfig": generation.config_id
             }
         )
 
         return generation
 
+    def bulk_populate(self, generation_id: str, docs: Iterable[Dict[str, Any]], batch_size: int = 100) -> int:
+        """
+        Ingests documents into the physical collection of an Index Generation.
+        Objects are sent in fixed-size batches rather than one request per document.
+        Returns the number of documents written.
+        """
+        gen = self.get_index_generation(generation_id)
+        if not gen:
+            raise ValueError(f"Generation {generation_id} not found")
+
+        collection = self.client.collections.get(gen.weaviate_collection_name)
+        count = 0
+        with collection.batch.fixed_size(batch_size=batch_size, concurrent_requests=2) as batch:
+            for doc in docs:
+                batch.add_object(properties=doc)
+                count += 1
+
+        failed = collection.batch.failed_objects
+        if failed:
+            raise RuntimeError(
+                f"{len(failed)} of {count} objects failed to import into "
+                f"{gen.weaviate_collection_name}: {failed[0].message}"
+            )
+        return count
+
     def get_index_generation(self, generation_id: str) -> Optional[IndexGeneration]:
-        collection = self.client.collections.get(GENERATION_CLASS)
-        result = collection.query.fetch_objects(
-            filters=Filter.by_property("generation_id").equal(generation_id),
-            limit=1
-        )
-        if not result.objects:
+        found = self._fetch_generation(generation_id)
+        return found[1] if found else None
+
+    def _fetch_generation(self, generation_id: str) -> Optional[Tuple[str, IndexGeneration]]:
+        """Returns (object UUID, generation), or None if it does not exist."""
+        obj = self._fetch_by_id(self._gen_coll, "generation_id", generation_id, _GENERATION_PROPERTIES)
+        if obj is None:
             return None
-        
-        props = result.objects[0].properties
-        return IndexGeneration(
-            id=props["generation_id"],
-            dataset_id=props["dataset_id"],
-            config_id=props["config_id"],
-            status=LifecycleState(props["status"]),
-            weaviate_collection_name=props["weaviate_collection_name"],
-            created_at=props["created_at"],
-            updated_at=props["updated_at"]
-        )
+        return str(obj.uuid), _to_generation(obj.properties)
+
+    def _fetch_by_id(self, collection: Any, id_property: str, object_id: str, return_properties: List[str]) -> Any:
+        """
+        Fetches the object stored under `object_id` as UUID. Objects written by older
+        versions carry random UUIDs, so while legacy lookups are enabled a miss falls
+        back to filtering on `id_property`.
+        """
+        if not _is_uuid(object_id):
+            return None
+        obj = collection.query.fetch_object_by_id(object_id, return_properties=return_properties)
+        if obj is None and self._legacy_lookups:
+            result = collection.query.fetch_objects(
+                filters=Filter.by_property(id_property).equal(object_id),
+                limit=1,
+                return_properties=return_properties
+            )
+            obj = result.objects[0] if result.objects else None
+        return obj
 
     def promote_index(self, generation_id: str, target_state: LifecycleState) -> IndexGeneration:
         """Promotes an index to a new state (e.g., STAGING -> PRODUCTION)."""
-        gen = self.get_index_generation(generation_id)
-        if not gen:
+        found = self._fetch_generation(generation_id)
+        if not found:
             raise ValueError(f"Generation {generation_id} not found")
+        obj_uuid, gen = found
 
-        # If promoting to PRODUCTION, we might want to archive the old one for this dataset
-        # For simplicity, we just allow multiple for now or rely on the user to use 
-        # get_production_index which returns the *latest* production index.
-        # But ideally, we should mark previous production as deprecated or archived.
-        
+        # Only validated states may go live; any other PRODUCTION generation of the
+        # dataset is deprecated first, so at most one stays authoritative.
         if target_state == LifecycleState.PRODUCTION:
-             self._archive_previous_production(gen.dataset_id, exclude_gen_id=generation_id)
-
-        # Update status
-        collection = self.client.collections.get(GENERATION_CLASS)
-        # We need the UUID of the object to update it. 
-        # Since we use a custom 'generation_id' property, we first find the object UUID.
-        result = collection.query.fetch_objects(
-            filters=Filter.by_property("generation_id").equal(generation_id),
-            limit=1
-        )
-        if not result.objects:
-            raise ValueError("System error: generation found earlier but not now")
-        
-        obj_uuid = result.objects[0].uuid
-        
+             if gen.status not in PROMOTABLE_TO_PROD:
+                 raise ValueError(
+                     f"Cannot promote generation {generation_id} from {gen.status.value} "
+                     f"to production; promote it to staging first"
+                 )
+             self._archive_previous_production(gen.dataset_id, exclude_uuid=obj_uuid)
+
+        # Update status (new generations are keyed by their generation_id)
+        now = datetime.now(_UTC)
+        collection = self._gen_coll
         collection.data.update(
             uuid=obj_uuid,
             properties={
                 "status": target_state.value,
-                "updated_at": datetime.utcnow()
+                "updated_at": now
             }
         )
         
+        previous_state = gen.status
         gen.status = target_state
+        gen.updated_at = now
+
+        # Only transitions into or out of PRODUCTION change what readers see
+        if LifecycleState.PRODUCTION in (target_state, previous_state):
+            dataset_name = self._resolve_dataset_name(gen.dataset_id)
+            if dataset_name is not None:
+                if target_state == LifecycleState.PRODUCTION:
+                    self._write_production_pointer(dataset_name, gen)
+                else:
+                    self._clear_production_pointer(dataset_name, generation_id)
+            self.invalidate(dataset_name)
         return gen
 
-    def _archive_previous_production(self, dataset_id: str, exclude_gen_id: str):
+    def _archive_previous_production(self, dataset_id: str, exclude_uuid: str):
         """Marks previous PRODUCTION indices for this dataset as DEPRECATED."""
-        collection = self.client.collections.get(GENERATION_CLASS)
+        collection = self._gen_coll
         
-        # Find all PRODUCTION indices for this dataset
+        # Find all other PRODUCTION indices for this dataset (exclusion evaluated server-side)
         results = collection.query.fetch_objects(
             filters=(
                 Filter.by_property("dataset_id").equal(dataset_id) & 
-                Filter.by_property("status").equal(LifecycleState.PRODUCTION.value)
-            )
+                _F_STATUS_PROD &
+                Filter.by_id().not_equal(exclude_uuid)
+            ),
+            return_properties=[]  # only the UUIDs are needed
         )
         
-        for obj in results.objects:
-            if obj.properties["generation_id"] == exclude_gen_id:
-                continue
-            
-            # Update to DEPRECATED
-            collection.data.update(
-                uuid=obj.uuid,
-                properties={
-                    "status": LifecycleState.DEPRECATED.value,
-                    "updated_at": datetime.utcnow()
-                }
-            )
+        stale = [obj.uuid for obj in results.objects]
+        if not stale:
+            return
+
+        properties = {
+            "status": _DEPRECATED,
+            "updated_at": datetime.now(_UTC)
+        }
+
+        def deprecate(obj_uuid):
+            collection.data.update(uuid=obj_uuid, properties=properties)
+
+        # Updates are independent, so issue them concurrently instead of one RTT each
+        with ThreadPoolExecutor(max_workers=min(len(stale), _ARCHIVE_MAX_WORKERS)) as pool:
+            # list() surfaces the first failed update as an exception
+            list(pool.map(deprecate, stale))
+
+    def invalidate(self, dataset_name: Optional[str] = None):
+        """Evicts the cached PRODUCTION index for a dataset (or for all datasets if None)."""
+        if dataset_name is None:
+            self._prod_cache.clear()
+        else:
+            self._prod_cache.pop(dataset_name, None)
+
+    def _resolve_dataset_name(self, dataset_id: str) -> Optional[str]:
+        name = self._dataset_id_to_name.get(dataset_id)
+        if name is not None:
+            return name
+
+        obj = self._fetch_by_id(self._ds_coll, "dataset_id", dataset_id, ["name"])
+        if obj is None:
+            return None
+        name = obj.properties["name"]
+        self._dataset_id_to_name[dataset_id] = name
+        return name
 
     def get_production_index(self, dataset_name: str) -> Optional[IndexGeneration]:
         """
-        Finds the active PRODUCTION index for a given dataset name.
-        Do this by joining Dataset and Generation (simulated join).
+        Returns the active PRODUCTION index for a given dataset name.
+        Results, including "none", are cached for `production_cache_ttl` seconds
+        and evicted on promotion.
         """
-        # 1. Find dataset ID by name
-        ds_coll = self.client.collections.get(DATASET_CLASS)
-        ds_res = ds_coll.query.fetch_objects(
-            filters=Filter.by_property("name").equal(dataset_name),
-            limit=1
-            # In a real system we'd pick a specific version, but here we assume dataset_name implies a logical group
-            # Actually, the user might want "latest production index for dataset 'Wiki'".
-        )
-        
-        if not ds_res.objects:
-            return None
-            
-        # If there are multiple versions of the dataset, we might have multiple IDs.
-        # But generally, we want the *index* that is in PRODUCTION for *any* version of this dataset?
-        # Or usually, a dataset is "Wiki v1" and "Wiki v2".
-        # Let's assume we search for all datasets with that name.
-        
-        # Simpler approach: Iterate all datasets with that name, find their ID, search for production index.
-        # Or, we query Generation where status=PRODUCTION and dataset_id IN (ids).
-        
-        # For this reference implementation, let's assume we want the *latest* updated PRODUCTION index 
-        # associated with any version of the dataset named `dataset_name`.
-        
-        target_dataset_ids = []
-        ds_res = ds_coll.query.fetch_objects(
-            filters=Filter.by_property("name").equal(dataset_name),
-            limit=100
-        )
-        for obj in ds_res.objects:
-            target_dataset_ids.append(obj.properties["dataset_id"])
-            
-        if not target_dataset_ids:
-            return None
+        cached = self._prod_cache.get(dataset_name)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
 
-        # 2. Find Generation with status=PRODUCTION and dataset_id in target_dataset_ids
-        gen_coll = self.client.collections.get(GENERATION_CLASS)
-        
-        # specific filter construction
-        dataset_filter = Filter.by_property("dataset_id").equal(target_dataset_ids[0])
-        for ds_id in target_dataset_ids[1:]:
-            dataset_filter = dataset_filter | Filter.by_property("dataset_id").equal(ds_id)
-            
-        final_filter = (
-            Filter.by_property("status").equal(LifecycleState.PRODUCTION.value) &
-            dataset_filter
+        gen = self._query_production_index(dataset_name)
+        self._prod_cache[dataset_name] = (gen, time.monotonic() + self._prod_ttl)
+        return gen
+
+    async def aget_production_index(self, dataset_name: str) -> Optional[IndexGeneration]:
+        """
+        Async variant of `get_production_index`. Cache hits return without leaving
+        the event loop; a miss runs the sync lookup in the default executor.
+        """
+        cached = self._prod_cache.get(dataset_name)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.get_production_index, dataset_name)
+
+    def _query_production_index(self, dataset_name: str) -> Optional[IndexGeneration]:
+        """Finds the active PRODUCTION index for a given dataset name."""
+        # Fast path: the pointer holds a copy of the generation, so this is one keyed
+        # GET. promote_index is its only writer and rewrites or clears it on every
+        # transition into or out of PRODUCTION.
+        obj = self._pointer_coll.query.fetch_object_by_id(
+            _pointer_uuid(dataset_name), return_properties=_GENERATION_PROPERTIES
         )
-        
+        if obj is not None:
+            return _to_generation(obj.properties)
+
+        # Fallback: single query on IndexGeneration, joining RAGDataset through the `hasDataset`
+        # reference. Any version of the dataset named `dataset_name` qualifies; the
+        # most recently updated PRODUCTION generation wins.
+        gen_coll = self._gen_coll
         gen_res = gen_coll.query.fetch_objects(
-            filters=final_filter,
-            sort=weaviate.classes.query.Sort.by_property("updated_at", ascending=False),
-            limit=1
+            filters=(
+                Filter.by_ref("hasDataset").by_property("name").equal(dataset_name) &
+                _F_STATUS_PROD
+            ),
+            sort=_SORT_UPDATED_DESC,
+            limit=1,
+            return_properties=_GENERATION_PROPERTIES
         )
         
+        if not gen_res.objects and self._legacy_lookups:
+            gen_res = self._query_production_by_dataset_ids(dataset_name)
         if not gen_res.objects:
             return None
-            
-        props = gen_res.objects[0].properties
-        return IndexGeneration(
-            id=props["generation_id"],
-            dataset_id=props["dataset_id"],
-            config_id=props["config_id"],
-            status=LifecycleState(props["status"]),
-            weaviate_collection_name=props["weaviate_collection_name"],
-            created_at=props["created_at"],
-            updated_at=props["updated_at"]
+
+        # Reads never write the pointer; promote_index is its only writer
+        return _to_generation(gen_res.objects[0].properties)
+
+    def _query_production_by_dataset_ids(self, dataset_name: str):
+        """
+        Legacy lookup for generations written without `hasDataset` references:
+        resolves the dataset ids by name, then matches them on `dataset_id`.
+        Only used until `initialize` finds the metadata migrated.
+        """
+        ds_res = self._ds_coll.query.fetch_objects(
+            filters=Filter.by_property("name").equal(dataset_name),
+            limit=100,
+            return_properties=["dataset_id"]
+        )
+        dataset_ids = [obj.properties["dataset_id"] for obj in ds_res.objects]
+        if not dataset_ids:
+            return ds_res
+
+        return self._gen_coll.query.fetch_objects(
+            filters=(
+                Filter.by_property("dataset_id").contains_any(dataset_ids) &
+                _F_STATUS_PROD
+            ),
+            sort=_SORT_UPDATED_DESC,
+            limit=1,
+            return_properties=_GENERATION_PROPERTIES
+        )
+
+    def _write_production_pointer(self, dataset_name: str, gen: IndexGeneration):
+        pointer_id = _pointer_uuid(dataset_name)
+        properties = {
+            "dataset_name": dataset_name,
+            "generation_id": gen.id,
+            "dataset_id": gen.dataset_id,
+            "config_id": gen.config_id,
+            "status": gen.status.value,
+            "weaviate_collection_name": gen.weaviate_collection_name,
+            "created_at": gen.created_at,
+            "updated_at": gen.updated_at
+        }
+        # Batch inserts overwrite by UUID, so this is a single idempotent upsert;
+        # concurrent promotions cannot collide on a duplicate insert.
+        result = self._pointer_coll.data.insert_many([DataObject(uuid=pointer_id, properties=properties)])
+        if result.has_errors:
+            error = next(iter(result.errors.values()))
+            raise RuntimeError(f"Failed to write production pointer for {dataset_name}: {error.message}")
+
+    def _clear_production_pointer(self, dataset_name: str, generation_id: str):
+        """Removes the pointer for `dataset_name` if it still targets `generation_id`."""
+        # One conditional delete rather than read-then-delete, so a pointer rewritten
+        # by a concurrent promotion is left alone.
+        self._pointer_coll.data.delete_many(
+            where=(
+                Filter.by_id().equal(_pointer_uuid(dataset_name)) &
+                Filter.by_property("generation_id").equal(generation_id)
+            )
         )
@@ -1,56 +1,222 @@
+from typing import Any, Dict, List, Optional
+
 import weaviate
 import weaviate.classes.config as wvc
+from weaviate.classes.data import DataObject
 
 DATASET_CLASS = "RAGDataset"
 CONFIG_CLASS = "EmbeddingConfig"
 GENERATION_CLASS = "IndexGeneration"
+PRODUCTION_POINTER_CLASS = "ProductionPointer"
+
+def _lookup_property(name: str) -> wvc.Property:
+    # Exact-match TEXT id/name/status: filterable with FIELD tokenization
+    return wvc.Property(name=name, data_type=wvc.DataType.TEXT, index_filterable=True, tokenization=wvc.Tokenization.FIELD)
+
+def _timestamp_property(name: str) -> wvc.Property:
+    # DATE with a range index so sorts and range filters use the index
+    return wvc.Property(name=name, data_type=wvc.DataType.DATE, index_filterable=True, index_range_filters=True)
+
+# Collection definitions, in creation order (reference targets first).
+_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    DATASET_CLASS: {
+        "properties": [
+            _lookup_property("dataset_id"),
+            _lookup_property("name"),
+            _lookup_property("version"),
+            _timestamp_property("created_at"),
+        ],
+    },
+    CONFIG_CLASS: {
+        "properties": [
+            _lookup_property("config_id"),
+            wvc.Property(name="model_name", data_type=wvc.DataType.TEXT),
+            wvc.Property(name="chunk_size", data_type=wvc.DataType.INT),
+            wvc.Property(name="chunk_overlap", data_type=wvc.DataType.INT),
+            _timestamp_property("created_at"),
+        ],
+    },
+    GENERATION_CLASS: {
+        "properties": [
+            _lookup_property("generation_id"),
+            _lookup_property("dataset_id"),
+            _lookup_property("config_id"),
+            _lookup_property("status"),
+            wvc.Property(name="weaviate_collection_name", data_type=wvc.DataType.TEXT),
+            _timestamp_property("created_at"),
+            _timestamp_property("updated_at"),
+        ],
+        "references": [
+            wvc.ReferenceProperty(name="hasDataset", target_collection=DATASET_CLASS),
+            wvc.ReferenceProperty(name="hasConfig", target_collection=CONFIG_CLASS),
+        ],
+    },
+    # One object per dataset name (UUID derived from the name) holding a copy of
+    # its current PRODUCTION generation, so resolving it is a keyed GET.
+    PRODUCTION_POINTER_CLASS: {
+        "properties": [
+            _lookup_property("dataset_name"),
+            _lookup_property("generation_id"),
+            _lookup_property("dataset_id"),
+            _lookup_property("config_id"),
+            _lookup_property("status"),
+            wvc.Property(name="weaviate_collection_name", data_type=wvc.DataType.TEXT),
+            _timestamp_property("created_at"),
+            _timestamp_property("updated_at"),
+        ],
+    },
+}
+
+# Property holding each object's own id; objects are stored under that UUID.
+_KEY_PROPERTIES = {
+    DATASET_CLASS: "dataset_id",
+    CONFIG_CLASS: "config_id",
+    GENERATION_CLASS: "generation_id",
+}
+
+# Suffix of the temporary collections objects are staged in while migrating.
+_MIGRATION_SUFFIX = "_Migration"
+
+# Reference name -> property holding the target's id, used to rebuild references.
+_REFERENCE_KEYS = {
+    GENERATION_CLASS: {"hasDataset": "dataset_id", "hasConfig": "config_id"},
+}
 
-def init_schemas(client: weaviate.WeaviateClient):
+def init_schemas(client: weaviate.WeaviateClient) -> List[str]:
     """
     Initializes the schema for the RAG Lifecycle Manager.
+
+    Lookup ids, names and statuses are filterable with FIELD tokenization so
+    equality filters are exact-match posting-list lookups; dates carry a range
+    index so `sort by updated_at` does not sort in memory.
+    Existing collections are left untouched; use `migrate_schemas` to bring
+    collections created by older versions up to date.
+    Returns the names of existing collections `migrate_schemas` would rebuild.
+    Raises RuntimeError while an interrupted migration is pending, since creating
+    empty collections in place of dropped originals would hide the staged data.
     """
     collections = client.collections.list_all()
-    
-    # RAGDataset
-    if DATASET_CLASS not in collections:
-        client.collections.create(
-            name=DATASET_CLASS,
-            properties=[
-                wvc.Property(name="dataset_id", data_type=wvc.DataType.TEXT),
-                wvc.Property(name="name", data_type=wvc.DataType.TEXT),
-                wvc.Property(name="version", data_type=wvc.DataType.TEXT),
-                wvc.Property(name="created_at", data_type=wvc.DataType.DATE),
-            ]
-        )
 
-    # EmbeddingConfig
-    if CONFIG_CLASS not in collections:
-        client.collections.create(
-            name=CONFIG_CLASS,
-            properties=[
-                wvc.Property(name="config_id", data_type=wvc.DataType.TEXT),
-                wvc.Property(name="model_name", data_type=wvc.DataType.TEXT),
-                wvc.Property(name="chunk_size", data_type=wvc.DataType.INT),
-                wvc.Property(name="chunk_overlap", data_type=wvc.DataType.INT),
-                wvc.Property(name="created_at", data_type=wvc.DataType.DATE),
-            ]
+    pending = [_staging_name(name) for name in _SCHEMAS if _staging_name(name) in collections]
+    if pending:
+        raise RuntimeError(
+            f"Interrupted schema migration found ({', '.join(pending)}); "
+            f"run migrate_schemas (initialize(migrate=True)) to finish it"
         )
 
-    # IndexGeneration
-    if GENERATION_CLASS not in collections:
-        client.collections.create(
-            name=GENERATION_CLASS,
-            properties=[
-                wvc.Property(name="generation_id", data_type=wvc.DataType.TEXT),
-                wvc.Property(name="dataset_id", data_type=wvc.DataType.TEXT),
-                wvc.Property(name="config_id", data_type=wvc.DataType.TEXT),
-                wvc.Property(name="status", data_type=wvc.DataType.TEXT),
-                wvc.Property(name="weaviate_collection_name", data_type=wvc.DataType.TEXT),
-                wvc.Property(name="created_at", data_type=wvc.DataType.DATE),
-                wvc.Property(name="updated_at", data_type=wvc.DataType.DATE),
-            ],
-            references=[
-               wvc.ReferenceProperty(name="hasDataset", target_collection=DATASET_CLASS),
-               wvc.ReferenceProperty(name="hasConfig", target_collection=CONFIG_CLASS),
-            ]
+    for name, definition in _SCHEMAS.items():
+        if name not in collections:
+            client.collections.create(name=name, **definition)
+
+    return _outdated_collections(collections)
+
+def _is_outdated(config: Any, properties: List[wvc.Property]) -> bool:
+    current = {prop.name: prop for prop in config.properties}
+    for prop in properties:
+        existing = current.get(prop.name)
+        if existing is None:
+            return True
+        if prop.indexFilterable is not None and existing.index_filterable != prop.indexFilterable:
+            return True
+        if prop.indexRangeFilters is not None and existing.index_range_filters != prop.indexRangeFilters:
+            return True
+        if prop.tokenization is not None and existing.tokenization != prop.tokenization:
+            return True
+    return False
+
+def _staging_name(name: str) -> str:
+    return name + _MIGRATION_SUFFIX
+
+def _copy_objects(client: weaviate.WeaviateClient, source: str, target: str,
+                  key: Optional[str], reference_keys: Dict[str, str]):
+    """Copies every object of `source` into `target` under its id property as UUID and verifies the count."""
+    objects = {}
+    for obj in client.collections.get(source).iterator():
+        props = obj.properties
+        obj_uuid = props.get(key, obj.uuid) if key else obj.uuid
+        objects[str(obj_uuid)] = DataObject(
+            uuid=obj_uuid,
+            properties=props,
+            references={ref: props[prop] for ref, prop in reference_keys.items() if props.get(prop)} or None,
         )
+
+    collection = client.collections.get(target)
+    if objects:
+        result = collection.data.insert_many(list(objects.values()))
+        if result.has_errors:
+            first = next(iter(result.errors.values()))
+            raise RuntimeError(
+                f"Copying {source} to {target} failed for {len(result.errors)} objects: {first.message}"
+            )
+    count = collection.aggregate.over_all(total_count=True).total_count
+    if count != len(objects):
+        raise RuntimeError(f"Copying {source} to {target} left {count} of {len(objects)} objects")
+
+def _outdated_collections(collections: Dict[str, Any]) -> List[str]:
+    stale = [
+        name for name, definition in _SCHEMAS.items()
+        if name in collections and _is_outdated(collections[name], definition["properties"])
+    ]
+    # References point at UUIDs, so re-keyed datasets/configs require rebuilding generations
+    if (DATASET_CLASS in stale or CONFIG_CLASS in stale) and GENERATION_CLASS in collections \
+            and GENERATION_CLASS not in stale:
+        stale.append(GENERATION_CLASS)
+        stale.sort(key=list(_SCHEMAS).index)
+    return stale
+
+def migrate_schemas(client: weaviate.WeaviateClient) -> List[str]:
+    """
+    Recreates metadata collections whose property index settings differ from the
+    current schema, since Weaviate cannot change them in place.
+
+    Objects are first copied into temporary `<Collection>_Migration` collections,
+    keyed by their id property (this also re-keys objects written by older
+    versions). Only once every copy is verified are the originals dropped,
+    recreated and refilled from the copies with references rebuilt from the
+    stored ids; the temporary collections are removed last. If a run is
+    interrupted, calling this again resumes from the staged copies.
+    Returns the names of the migrated collections.
+    """
+    collections = client.collections.list_all()
+
+    # The first stale collection is always outdated itself and is both dropped and
+    # recreated first: once it is missing or current, the staged copies are complete.
+    staged = [name for name in _SCHEMAS if _staging_name(name) in collections]
+    resuming = bool(staged) and (
+        staged[0] not in collections
+        or not _is_outdated(collections[staged[0]], _SCHEMAS[staged[0]]["properties"])
+    )
+
+    if resuming:
+        stale = staged
+    else:
+        stale = _outdated_collections(collections)
+        if not stale:
+            return []
+
+        for name in stale:
+            staging = _staging_name(name)
+            if staging in collections:
+                # Partial copy left by an interrupted run; the original is still intact
+                client.collections.delete(staging)
+            client.collections.create(name=staging, properties=_SCHEMAS[name]["properties"])
+            _copy_objects(client, name, staging, _KEY_PROPERTIES.get(name), {})
+
+    # Drop the originals in definition order. Once recreating them has begun (the
+    # first is back), only collections still on the old schema are dropped.
+    recreating = resuming and stale[0] in collections
+    for name in stale:
+        if name in collections and (
+            not recreating or _is_outdated(collections[name], _SCHEMAS[name]["properties"])
+        ):
+            client.collections.delete(name)
+
+    for name in stale:
+        if not client.collections.exists(name):
+            client.collections.create(name=name, **_SCHEMAS[name])
+        _copy_objects(client, _staging_name(name), name, _KEY_PROPERTIES.get(name), _REFERENCE_KEYS.get(name, {}))
+
+    for name in stale:
+        client.collections.delete(_staging_name(name))
+
+    return stale
@@ -7,3 +7,10 @@ class LifecycleState(str, Enum):
     PRODUCTION = 'production'
     DEPRECATED = 'deprecated'
     ARCHIVED = 'archived'
+
+# States an index may be promoted to PRODUCTION from: a verified STAGING index,
+# a DEPRECATED one being rolled back to, or PRODUCTION itself (re-promoting
+# re-runs the archive step and rewrites the production pointer as a repair).
+PROMOTABLE_TO_PROD = frozenset({
+    LifecycleState.STAGING, LifecycleState.DEPRECATED, LifecycleState.PRODUCTION
+})
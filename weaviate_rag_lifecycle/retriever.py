@@ -1,11 +1,21 @@
-from typing import List, Any
+import threading
+from collections import OrderedDict
+from typing import List, Any, Dict, Optional, Tuple
+from pydantic import PrivateAttr
 from langchain_core.retrievers import BaseRetriever
-from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
 from langchain_core.documents import Document
 
 from .lifecycle.manager import WeaviateRAGLifecycleManager
 from .lifecycle.states import LifecycleState
 
+# search_type -> collection.query method
+_QUERY_METHODS = {
+    "near_text": "near_text",
+    "bm25": "bm25",
+    "hybrid": "hybrid",
+}
+
 class LifecycleAwareRetriever(BaseRetriever):
     """
     A LangChain Retriever that automatically queries the current PRODUCTION index
@@ -15,6 +25,78 @@ class LifecycleAwareRetriever(BaseRetriever):
     dataset_name: str
     search_type: str = "near_text"  # "near_text", "bm25", "hybrid"
     search_kwargs: dict = {}
+    # Properties to fetch from the index; None returns all (all end up in metadata)
+    return_properties: Optional[List[str]] = None
+    cache_size: int = 1024  # Max cached query results; 0 disables the cache
+
+    # LRU of (generation_id, search_type, query, k) -> documents. Cleared whenever
+    # the PRODUCTION generation changes, so results never outlive a promotion.
+    _query_cache: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _cache_gen_id: Optional[str] = PrivateAttr(default=None)
+    _cache_lock: Any = PrivateAttr(default_factory=threading.Lock)
+    # generation_id -> collection handle for the current PRODUCTION generation
+    _collections: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    # Same, for handles from the manager's async client
+    _async_collections: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    # Name of the collection.query method for search_type, bound once at construction
+    _query_method_name: str = PrivateAttr(default="near_text")
+
+    def model_post_init(self, __context: Any) -> None:
+        try:
+            self._query_method_name = _QUERY_METHODS[self.search_type]
+        except KeyError:
+            raise ValueError(
+                f"Unsupported search_type {self.search_type!r}; expected one of {sorted(_QUERY_METHODS)}"
+            ) from None
+
+    def refresh(self):
+        """Forces the next query to re-resolve the PRODUCTION index."""
+        self.lifecycle_manager.invalidate(self.dataset_name)
+        with self._cache_lock:
+            self._query_cache.clear()
+            self._cache_gen_id = None
+        self._collections = {}
+        self._async_collections = {}
+
+    def _cache_get(self, key: Tuple[str, str, str, int]) -> Optional[List[Document]]:
+        with self._cache_lock:
+            if self._cache_gen_id != key[0]:
+                self._query_cache.clear()
+                self._cache_gen_id = key[0]
+                return None
+            docs = self._query_cache.get(key)
+            if docs is None:
+                return None
+            self._query_cache.move_to_end(key)
+        # Callers (and downstream chains) may mutate documents and their metadata
+        return _copy_documents(docs)
+
+    def _cache_put(self, key: Tuple[str, str, str, int], docs: List[Document]):
+        if self.cache_size <= 0:
+            return
+        docs = _copy_documents(docs)
+        with self._cache_lock:
+            if self._cache_gen_id != key[0]:
+                return
+            self._query_cache[key] = docs
+            self._query_cache.move_to_end(key)
+            while len(self._query_cache) > self.cache_size:
+                self._query_cache.popitem(last=False)
+
+    def _get_collection(self, prod_index) -> Any:
+        collection = self._collections.get(prod_index.id)
+        if collection is None:
+            collection = self.lifecycle_manager.client.collections.get(prod_index.weaviate_collection_name)
+            # Only the current generation is ever queried; drop handles to older ones.
+            self._collections = {prod_index.id: collection}
+        return collection
+
+    def _get_async_collection(self, async_client, prod_index) -> Any:
+        collection = self._async_collections.get(prod_index.id)
+        if collection is None:
+            collection = async_client.collections.get(prod_index.weaviate_collection_name)
+            self._async_collections = {prod_index.id: collection}
+        return collection
 
     def _get_relevant_documents(
         self, query: str, *, run_manager: CallbackManagerForRetrieverRun
@@ -29,52 +111,85 @@ class LifecycleAwareRetriever(BaseRetriever):
             print(f"WARNING: No PRODUCTION index found for dataset '{self.dataset_name}'. Returning empty results.")
             return []
             
+        limit_val = self.search_kwargs.get("k", 4)
+
+        # 2. Serve repeated queries against the same generation from the LRU
+        cache_key = (prod_index.id, self.search_type, query, limit_val)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         collection_name = prod_index.weaviate_collection_name
         
-        # 2. Execute Query against that collection
-        client = self.lifecycle_manager.client
-        collection = client.collections.get(collection_name)
-        
-        limit_val = self.search_kwargs.get("k", 4)
+        # 3. Execute Query against that collection
+        collection = self._get_collection(prod_index)
         
         try:
-            if self.search_type == "bm25":
-                response = collection.query.bm25(
-                    query=query,
-                    limit=limit_val
-                )
-            elif self.search_type == "near_text":
-                response = collection.query.near_text(
-                    query=query,
-                    limit=limit_val
-                )
-            else:
-                 # Default to near_text or handle other types
-                response = collection.query.near_text(
-                    query=query,
-                    limit=limit_val
-                )
+            query_fn = getattr(collection.query, self._query_method_name)
+            response = query_fn(
+                query=query,
+                limit=limit_val,
+                return_properties=self.return_properties
+            )
         except Exception as e:
             print(f"Error querying collection {collection_name} with {self.search_type}: {e}")
             return []
             
-        # 3. Convert to LangChain Documents
-            
-        # 3. Convert to LangChain Documents
-        documents = []
-        for obj in response.objects:
-            # We assume the stored object has a 'text' property or similar.
-            # We blindly copy all properties to metadata and try to find a page_content.
-            
-            content = obj.properties.get("text", "") or obj.properties.get("content", "")
-            if not content:
-                # Fallback: use the string representation of properties
-                content = str(obj.properties)
-                
-            doc = Document(
-                page_content=content,
-                metadata=obj.properties
-            )
-            documents.append(doc)
-            
+        # 4. Convert to LangChain Documents
+        documents = self._to_documents(response.objects)
+
+        self._cache_put(cache_key, documents)
         return documents
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        """
+        Async variant of `_get_relevant_documents` using the manager's async client.
+        """
+        async_client = await self.lifecycle_manager.get_async_client()
+        if async_client is None:
+            # No async client configured: run the sync path in an executor
+            return await super()._aget_relevant_documents(query, run_manager=run_manager)
+
+        prod_index = await self.lifecycle_manager.aget_production_index(self.dataset_name)
+        if not prod_index:
+            print(f"WARNING: No PRODUCTION index found for dataset '{self.dataset_name}'. Returning empty results.")
+            return []
+
+        limit_val = self.search_kwargs.get("k", 4)
+        cache_key = (prod_index.id, self.search_type, query, limit_val)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        collection_name = prod_index.weaviate_collection_name
+        collection = self._get_async_collection(async_client, prod_index)
+
+        try:
+            # Same collection.query method as the sync path, so both share cache entries
+            query_fn = getattr(collection.query, self._query_method_name)
+            response = await query_fn(query=query, limit=limit_val, return_properties=self.return_properties)
+        except Exception as e:
+            print(f"Error querying collection {collection_name} with {self.search_type}: {e}")
+            return []
+
+        documents = self._to_documents(response.objects)
+        self._cache_put(cache_key, documents)
+        return documents
+
+    @staticmethod
+    def _to_documents(objects: List[Any]) -> List[Document]:
+        # We assume the stored object has a 'text' property or similar.
+        # We blindly copy all properties to metadata and try to find a page_content,
+        # falling back to the string representation of properties.
+        def to_doc(obj: Any) -> Document:
+            props = obj.properties
+            content = props.get("text") or props.get("content") or str(props)
+            return Document(page_content=content, metadata=props)
+
+        return [to_doc(obj) for obj in objects]
+
+
+def _copy_documents(docs: List[Document]) -> List[Document]:
+    return [doc.model_copy(deep=True) for doc in docs]